@@ -1,10 +1,27 @@
 """
 Evaluator Agent - Judges execution quality
 """
+from dataclasses import dataclass, field
+from typing import Dict, Set
 from schemas import ExecutionTrace, EvaluationResult
-from groq import Groq
+from groq_client import get_groq_client
 import config
 import json
+import math
+
+
+# Static feedback for the common all-criteria-met case
+_PASS_FEEDBACK = "✅ Excellent! All criteria met. Required tools used, correct sequence followed, and answer is supported by data."
+
+# Phrases showing the answer honestly admits it has no data
+_NO_DATA_PHRASES = ("don't have", "no data", "cannot answer", "insufficient information")
+
+
+@dataclass
+class ToolStats:
+    """Summary of executed tools, gathered in a single pass over a trace"""
+    names: Set[str] = field(default_factory=set)
+    first_idx: Dict[str, int] = field(default_factory=dict)  # tool name -> first position
 
 
 class EvaluatorAgent:
@@ -18,7 +35,11 @@ class EvaluatorAgent:
         if not config.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY not set")
         
-        self.client = Groq(api_key=config.GROQ_API_KEY)
+        self.client = get_groq_client()
+        
+        # Results for traces where no tool ran, keyed by whether the answer
+        # admits missing data (the only thing that varies in that case)
+        self._no_tools_results = {}
     
     def evaluate(self, trace: ExecutionTrace) -> EvaluationResult:
         """
@@ -30,27 +51,53 @@ class EvaluatorAgent:
         Returns:
             EvaluationResult with pass/fail and detailed feedback
         """
+        # Fast path: nothing ran, so the verdict is fixed up to answer honesty
+        if not trace.tools_executed:
+            honest = self._admits_missing_data(trace.final_answer)
+            result = self._no_tools_results.get(honest)
+            if result is None:
+                result = self._evaluate(trace)
+                self._no_tools_results[honest] = result
+            return result.model_copy(deep=True)
+        
+        return self._evaluate(trace)
+    
+    def _evaluate(self, trace: ExecutionTrace) -> EvaluationResult:
+        """Run all checks and build the full evaluation result"""
         issues = []
+        stats = self._scan(trace)
         
         # Check 1: Were required tools used?
-        executed_tools = [t.tool_name for t in trace.tools_executed if t.executed]
-        required_tools_used = "web_search" in executed_tools
+        required_tools_used = "web_search" in stats.names
         
         if not required_tools_used:
             issues.append("Required tool 'web_search' was not executed")
         
         # Check 2: Was correct sequence followed?
-        correct_sequence = self._check_sequence(executed_tools)
+        correct_sequence = self._check_sequence(stats)
         
         if not correct_sequence:
             issues.append("Tools were not called in the correct sequence (web_search → summarize)")
         
         # Check 3: Is answer supported by data?
-        answer_supported = self._check_answer_support(trace)
+        answer_supported = self._check_answer_support(stats, trace)
         
         if not answer_supported:
             issues.append("Answer may not be supported by search data")
         
+        # Fast path: everything passed, no feedback to build and nothing
+        # to validate (all fields are fixed, known-good values)
+        if required_tools_used and correct_sequence and answer_supported:
+            return EvaluationResult.model_construct(
+                passed=True,
+                score=1.0,
+                required_tools_used=True,
+                correct_sequence_followed=True,
+                answer_supported_by_data=True,
+                feedback=_PASS_FEEDBACK,
+                issues=issues
+            )
+        
         # Calculate overall score
         checks_passed = sum([
             required_tools_used,
@@ -63,7 +110,7 @@ class EvaluatorAgent:
         passed = score >= 0.66  # At least 2 out of 3 criteria
         
         # Generate feedback
-        feedback = self._generate_feedback(trace, issues, score)
+        feedback = self._generate_feedback(stats, issues, score)
         
         return EvaluationResult(
             passed=passed,
@@ -75,81 +122,75 @@ class EvaluatorAgent:
             issues=issues
         )
     
-    def _check_sequence(self, executed_tools: list) -> bool:
+    def _scan(self, trace: ExecutionTrace) -> ToolStats:
+        """Collect executed tool names and first-occurrence indices in one pass"""
+        stats = ToolStats()
+        idx = 0
+        
+        for t in trace.tools_executed:
+            if not t.executed:
+                continue
+            
+            if t.tool_name not in stats.names:
+                stats.names.add(t.tool_name)
+                stats.first_idx[t.tool_name] = idx
+            idx += 1
+        
+        return stats
+    
+    def _check_sequence(self, stats: ToolStats) -> bool:
         """Check if tools were executed in correct order"""
-        if not executed_tools:
+        # web_search is required; summarize, if used, must come after it
+        if "web_search" not in stats.names:
             return False
         
-        # Ideal sequence: web_search before summarize
-        if "web_search" in executed_tools and "summarize" in executed_tools:
-            search_idx = executed_tools.index("web_search")
-            summarize_idx = executed_tools.index("summarize")
-            return search_idx < summarize_idx
-        
-        # If only web_search, that's acceptable
-        if "web_search" in executed_tools:
-            return True
-        
-        return False
+        return stats.first_idx.get("summarize", math.inf) > stats.first_idx["web_search"]
     
-    def _check_answer_support(self, trace: ExecutionTrace) -> bool:
+    def _check_answer_support(self, stats: ToolStats, trace: ExecutionTrace) -> bool:
         """
-        Use LLM to check if answer is supported by search data
+        Check if answer is supported by search data
         """
         # If web_search wasn't executed, answer can't be properly supported
-        web_search_executed = any(
-            t.tool_name == "web_search" and t.executed 
-            for t in trace.tools_executed
-        )
-        
-        if not web_search_executed:
-            # Check if answer admits lack of data
-            answer_lower = trace.final_answer.lower()
-            if any(phrase in answer_lower for phrase in [
-                "don't have", "no data", "cannot answer", "insufficient information"
-            ]):
-                return True  # Honest admission
-            return False  # Made up answer without data
+        if "web_search" not in stats.names:
+            # Honest admission is fine; otherwise it's a made up answer without data
+            return self._admits_missing_data(trace.final_answer)
         
         return True  # If search was executed, assume answer is based on it
     
+    @staticmethod
+    def _admits_missing_data(answer: str) -> bool:
+        """Check if an answer admits it lacks supporting data"""
+        answer_lower = answer.lower()
+        return any(phrase in answer_lower for phrase in _NO_DATA_PHRASES)
+    
     def _generate_feedback(
         self,
-        trace: ExecutionTrace,
+        stats: ToolStats,
         issues: list,
         score: float
     ) -> str:
         """Generate human-readable feedback with detailed breakdown"""
         if score == 1.0:
-            return "✅ Excellent! All criteria met. Required tools used, correct sequence followed, and answer is supported by data."
+            return _PASS_FEEDBACK
         
         elif score >= 0.66:
-            feedback = f"⚠️  Acceptable but could improve.\n"
-            feedback += f"📋 Failure Breakdown:\n"
-            for i, issue in enumerate(issues, 1):
-                feedback += f"   {i}. {issue}\n"
-            return feedback.strip()
+            parts = ["⚠️  Acceptable but could improve.\n", "📋 Failure Breakdown:\n"]
+            parts.extend(f"   {i}. {issue}\n" for i, issue in enumerate(issues, 1))
+            return "".join(parts).strip()
         
         else:
-            feedback = f"❌ Failed evaluation.\n"
-            feedback += f"📋 Failure Breakdown:\n"
-            for i, issue in enumerate(issues, 1):
-                feedback += f"   {i}. {issue}\n"
-            feedback += f"\n💡 What went wrong:\n"
+            parts = ["❌ Failed evaluation.\n", "📋 Failure Breakdown:\n"]
+            parts.extend(f"   {i}. {issue}\n" for i, issue in enumerate(issues, 1))
+            parts.append("\n💡 What went wrong:\n")
             
             # Detailed analysis of what failed
-            executed_tools = [t.tool_name for t in trace.tools_executed if t.executed]
-            
-            if not executed_tools or "web_search" not in executed_tools:
-                feedback += "   → Did not search the web for information\n"
+            if "web_search" not in stats.names:
+                parts.append("   → Did not search the web for information\n")
             
-            if "web_search" in executed_tools and "summarize" in executed_tools:
-                search_idx = executed_tools.index("web_search")
-                summarize_idx = executed_tools.index("summarize")
-                if search_idx > summarize_idx:
-                    feedback += "   → Tried to summarize before searching\n"
+            if stats.first_idx.get("summarize", math.inf) < stats.first_idx.get("web_search", -1):
+                parts.append("   → Tried to summarize before searching\n")
             
-            if not any(t.executed for t in trace.tools_executed):
-                feedback += "   → No tools were executed at all\n"
+            if not stats.names:
+                parts.append("   → No tools were executed at all\n")
             
-            return feedback.strip()
+            return "".join(parts).strip()
@@ -1,13 +1,40 @@
 """
 Executor Agent - Executes research plans and can make mistakes
 """
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from schemas import ResearchPlan, ExecutionTrace, ToolExecution
 from tools import search_web, summarize_text, format_search_results
+from groq_client import get_groq_client
+from llm_cache import cached_chat
 import config
+import hashlib
+import logging
 import time
 import random
+from string import Template
+
+log = logging.getLogger(__name__)
+
+# Answer prompts, compiled once; only the question and search data vary
+_ANSWER_SYSTEM_MSG = "You are a professional research assistant. Answer questions ONLY based on provided search data. Never fabricate information. Be precise, factual, and cite evidence from the data."
+
+_ANSWER_PROMPT = Template("""You are a professional research assistant. Your task is to provide a comprehensive, factual answer based STRICTLY on the provided search data.
+
+RESEARCH QUESTION:
+$question
+
+SEARCH DATA:
+$context
+
+INSTRUCTIONS:
+1. Answer ONLY based on the data provided above
+2. Do NOT use prior knowledge or make assumptions
+3. If data is insufficient, clearly state: "Based on the provided data, [limited info available]"
+4. Structure your answer clearly and concisely
+5. Cite key facts from the search results
+
+Provide your evidence-based answer:""")
 
 
 class ExecutorAgent:
@@ -23,7 +50,10 @@ class ExecutorAgent:
         if not config.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY not set")
         
-        self.client = Groq(api_key=config.GROQ_API_KEY)
+        self.client = get_groq_client()
+        
+        # Runs blocking tool calls (search, summarize) concurrently with the run
+        self._pool = ThreadPoolExecutor(max_workers=config.EXECUTOR_MAX_WORKERS)
     
     def execute_plan(self, plan: ResearchPlan) -> ExecutionTrace:
         """
@@ -39,15 +69,32 @@ class ExecutorAgent:
         tools_executed = []
         search_data = ""
         
-        print(f"\n📋 Executing plan with {len(plan.steps)} steps...\n")
+        # Tool calls for this run, so repeated steps don't re-run the same work
+        search_futures = {}   # query -> Future[search results]
+        summary_futures = {}  # digest of summarized text -> Future[SummaryOutput]
+        pending_summaries = []  # (position in tools_executed, Future) resolved after the loop
+        
+        # Prefetch: start the search as soon as the plan arrives, so the loop
+        # collects a request that is already in flight
+        if any(step.tool_required == "web_search" for step in plan.steps):
+            search_futures[plan.question] = self._pool.submit(search_web, plan.question)
+        
+        log.info("\n📋 Executing plan with %d steps...\n", len(plan.steps))
         
+        # Tools are dispatched here from the plan rather than through LLM
+        # function calling: the evaluator and learner judge the planner's tool
+        # choices, and this path already needs only one answer completion
         for step in plan.steps:
-            print(f"Step {step.step_number}: {step.description}")
+            log.info("Step %d: %s", step.step_number, step.description)
             
             # Execute the required tool
             if step.tool_required == "web_search":
                 try:
-                    results = search_web(plan.question)
+                    future = search_futures.get(plan.question)
+                    if future is None:
+                        future = self._pool.submit(search_web, plan.question)
+                        search_futures[plan.question] = future
+                    results = future.result()
                     search_data = format_search_results(results)
                     
                     tools_executed.append(ToolExecution(
@@ -55,7 +102,7 @@ class ExecutorAgent:
                         executed=True,
                         output_summary=f"Found {len(results)} results"
                     ))
-                    print(f"  ✓ Web search completed: {len(results)} results")
+                    log.info("  ✓ Web search completed: %d results", len(results))
                 
                 except Exception as e:
                     tools_executed.append(ToolExecution(
@@ -63,41 +110,53 @@ class ExecutorAgent:
                         executed=False,
                         error=str(e)
                     ))
-                    print(f"  ✗ Web search failed: {e}")
+                    log.warning("  ✗ Web search failed: %s", e)
             
             elif step.tool_required == "summarize":
-                
-                try:
-                    if search_data:
-                        summary = summarize_text(search_data, "search results")
-                        tools_executed.append(ToolExecution(
-                            tool_name="summarize",
-                            executed=True,
-                            output_summary=f"Extracted {len(summary.key_points)} key points"
-                        ))
-                        print(f"  ✓ Summarization completed")
-                    else:
-                        tools_executed.append(ToolExecution(
-                            tool_name="summarize",
-                            executed=False,
-                            output_summary="No data to summarize"
-                        ))
-                        print("  ⚠️  No data to summarize")
-                
-                except Exception as e:
+                if search_data:
+                    # The answer doesn't depend on the summary, so let it run
+                    # alongside answer generation and collect it afterwards
+                    key = hashlib.blake2b(search_data.encode(), digest_size=16).digest()
+                    future = summary_futures.get(key)
+                    if future is None:
+                        future = self._pool.submit(summarize_text, search_data, "search results")
+                        summary_futures[key] = future
+                    pending_summaries.append((len(tools_executed), future))
+                    tools_executed.append(None)
+                    log.info("  → Summarization started")
+                else:
                     tools_executed.append(ToolExecution(
                         tool_name="summarize",
                         executed=False,
-                        error=str(e)
+                        output_summary="No data to summarize"
                     ))
-                    print(f"  ✗ Summarization failed: {e}")
+                    log.warning("  ⚠️  No data to summarize")
             
             else:
-                print(f"  → No tool required")
+                log.info("  → No tool required")
         
         # Generate final answer
         final_answer = self._generate_answer(plan.question, search_data)
         
+        # Collect background summaries into their step positions
+        for position, future in pending_summaries:
+            try:
+                summary = future.result()
+                tools_executed[position] = ToolExecution(
+                    tool_name="summarize",
+                    executed=True,
+                    output_summary=f"Extracted {len(summary.key_points)} key points"
+                )
+                log.info("  ✓ Summarization completed")
+            
+            except Exception as e:
+                tools_executed[position] = ToolExecution(
+                    tool_name="summarize",
+                    executed=False,
+                    error=str(e)
+                )
+                log.warning("  ✗ Summarization failed: %s", e)
+        
         execution_time = time.time() - start_time
         
         return ExecutionTrace(
@@ -114,30 +173,16 @@ class ExecutorAgent:
         
         context = search_data if search_data else "No search data available"
         
-        prompt = f"""You are a professional research assistant. Your task is to provide a comprehensive, factual answer based STRICTLY on the provided search data.
-
-RESEARCH QUESTION:
-{question}
-
-SEARCH DATA:
-{context}
-
-INSTRUCTIONS:
-1. Answer ONLY based on the data provided above
-2. Do NOT use prior knowledge or make assumptions
-3. If data is insufficient, clearly state: "Based on the provided data, [limited info available]"
-4. Structure your answer clearly and concisely
-5. Cite key facts from the search results
-
-Provide your evidence-based answer:"""
+        prompt = _ANSWER_PROMPT.substitute(question=question, context=context)
         
         try:
-            response = self.client.chat.completions.create(
+            answer = cached_chat(
+                self.client,
                 model=config.GROQ_MODEL,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a professional research assistant. Answer questions ONLY based on provided search data. Never fabricate information. Be precise, factual, and cite evidence from the data."
+                        "content": _ANSWER_SYSTEM_MSG
                     },
                     {
                         "role": "user",
@@ -148,7 +193,7 @@ Provide your evidence-based answer:"""
                 max_tokens=500
             )
             
-            return response.choices[0].message.content.strip()
+            return answer.strip()
         
         except Exception as e:
             return f"Error generating answer: {e}"
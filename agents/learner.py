@@ -1,13 +1,62 @@
 """
 Learner Agent - Analyzes mistakes and generates learning rules
 """
-from typing import List
+from typing import List, Optional, Tuple
+from collections import defaultdict
+from operator import attrgetter
 from schemas import (
     EvaluationResult, ExecutionTrace, Mistake, 
     LearningRule, MistakeType
 )
 from datetime import datetime
+import functools
 import hashlib
+import re
+
+
+# (issue pattern, mistake type, description template, corrective rule)
+Rule = Tuple[re.Pattern, str, str, str]
+
+_TOOL_SKIPPED_RULE = (
+    re.compile(r"(?=.*web_search)(?=.*not executed)", re.DOTALL),
+    MistakeType.TOOL_SKIPPED,
+    "Failed to execute web_search for question: {question}",
+    "ALWAYS execute web_search before attempting to answer research questions"
+)
+_WRONG_ORDER_RULE = (
+    re.compile(r"sequence", re.IGNORECASE),
+    MistakeType.WRONG_ORDER,
+    "Tools executed in wrong order for: {question}",
+    "ALWAYS execute web_search BEFORE summarize"
+)
+
+# "Answer not supported" maps to a different mistake depending on
+# whether any data was gathered
+_UNSUPPORTED_PATTERN = re.compile(r"not supported", re.IGNORECASE)
+_PREMATURE_ANSWER_RULE = (
+    _UNSUPPORTED_PATTERN,
+    MistakeType.PREMATURE_ANSWER,
+    "Answered without gathering data: {question}",
+    "NEVER answer research questions without first executing web_search"
+)
+_UNSUPPORTED_CLAIM_RULE = (
+    _UNSUPPORTED_PATTERN,
+    MistakeType.UNSUPPORTED_CLAIM,
+    "Answer contradicts search data: {question}",
+    "ALWAYS base answers strictly on search results"
+)
+
+# Rule tables, checked in order (first match wins), one per search outcome
+_RULES_WITHOUT_SEARCH: List[Rule] = [_TOOL_SKIPPED_RULE, _WRONG_ORDER_RULE, _PREMATURE_ANSWER_RULE]
+_RULES_AFTER_SEARCH: List[Rule] = [_TOOL_SKIPPED_RULE, _WRONG_ORDER_RULE, _UNSUPPORTED_CLAIM_RULE]
+
+
+def _match_rule(issue: str, rules: List[Rule]) -> Optional[Rule]:
+    """Return the first rule whose pattern matches the issue, if any"""
+    for rule in rules:
+        if rule[0].search(issue):
+            return rule
+    return None
 
 
 class LearnerAgent:
@@ -32,46 +81,30 @@ class LearnerAgent:
             List of Mistake objects
         """
         mistakes = []
+        question = trace.plan.question
+        timestamp = datetime.now().isoformat()  # One timestamp for the whole batch
+        
+        # Scan tools once; decides which "unsupported answer" mistake applies
+        web_search_executed = any(
+            t.tool_name == "web_search" and t.executed 
+            for t in trace.tools_executed
+        )
+        rules = _RULES_AFTER_SEARCH if web_search_executed else _RULES_WITHOUT_SEARCH
         
-        # Analyze each issue
+        # Analyze each issue against the first matching rule
         for issue in evaluation.issues:
-            if "web_search" in issue and "not executed" in issue:
-                mistakes.append(self._create_mistake(
-                    mistake_type=MistakeType.TOOL_SKIPPED,
-                    description=f"Failed to execute web_search for question: {trace.plan.question}",
-                    corrective_rule="ALWAYS execute web_search before attempting to answer research questions",
-                    question=trace.plan.question
-                ))
-            
-            elif "sequence" in issue.lower():
-                mistakes.append(self._create_mistake(
-                    mistake_type=MistakeType.WRONG_ORDER,
-                    description=f"Tools executed in wrong order for: {trace.plan.question}",
-                    corrective_rule="ALWAYS execute web_search BEFORE summarize",
-                    question=trace.plan.question
-                ))
+            rule = _match_rule(issue, rules)
+            if rule is None:
+                continue
             
-            elif "not supported" in issue.lower():
-                # Check if answer was given without data
-                web_search_executed = any(
-                    t.tool_name == "web_search" and t.executed 
-                    for t in trace.tools_executed
-                )
-                
-                if not web_search_executed:
-                    mistakes.append(self._create_mistake(
-                        mistake_type=MistakeType.PREMATURE_ANSWER,
-                        description=f"Answered without gathering data: {trace.plan.question}",
-                        corrective_rule="NEVER answer research questions without first executing web_search",
-                        question=trace.plan.question
-                    ))
-                else:
-                    mistakes.append(self._create_mistake(
-                        mistake_type=MistakeType.UNSUPPORTED_CLAIM,
-                        description=f"Answer contradicts search data: {trace.plan.question}",
-                        corrective_rule="ALWAYS base answers strictly on search results",
-                        question=trace.plan.question
-                    ))
+            _, mistake_type, description, corrective_rule = rule
+            mistakes.append(self._create_mistake(
+                mistake_type=mistake_type,
+                description=description.format(question=question),
+                corrective_rule=corrective_rule,
+                question=question,
+                timestamp=timestamp
+            ))
         
         return mistakes
     
@@ -80,7 +113,8 @@ class LearnerAgent:
         mistake_type: str,
         description: str,
         corrective_rule: str,
-        question: str
+        question: str,
+        timestamp: str
     ) -> Mistake:
         """Create a Mistake object"""
         return Mistake(
@@ -88,7 +122,7 @@ class LearnerAgent:
             description=description,
             corrective_rule=corrective_rule,
             question=question,
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp
         )
     
     def generate_learning_rules(self, mistakes: List[Mistake]) -> List[LearningRule]:
@@ -101,34 +135,37 @@ class LearnerAgent:
         Returns:
             List of LearningRule objects prioritized by frequency
         """
-        # Group mistakes by type
-        mistake_groups = {}
+        # Count mistakes per type and track the most recent one, in one pass
+        counts = defaultdict(int)
+        latest = {}
         for mistake in mistakes:
-            if mistake.mistake_type not in mistake_groups:
-                mistake_groups[mistake.mistake_type] = []
-            mistake_groups[mistake.mistake_type].append(mistake)
+            mistake_type = mistake.mistake_type
+            counts[mistake_type] += 1
+            current = latest.get(mistake_type)
+            if current is None or mistake.timestamp > current.timestamp:
+                latest[mistake_type] = mistake
         
         rules = []
         
-        for mistake_type, group in mistake_groups.items():
-            # Use the most recent mistake's rule
-            latest = max(group, key=lambda m: m.timestamp)
-            
+        for mistake_type, mistake in latest.items():
             # Priority based on frequency and severity
-            frequency = len(group)
+            frequency = counts[mistake_type]
             priority = min(10, 3 + frequency)  # Higher frequency = higher priority
             
             rule_id = self._generate_rule_id(mistake_type)
             
             rules.append(LearningRule(
                 rule_id=rule_id,
-                rule_text=latest.corrective_rule,
+                rule_text=mistake.corrective_rule,  # Use the most recent mistake's rule
                 applies_to="planning",  # Most rules affect planning
                 priority=priority
             ))
         
-        return sorted(rules, key=lambda r: r.priority, reverse=True)
+        rules.sort(key=attrgetter("priority"), reverse=True)
+        return rules
     
-    def _generate_rule_id(self, mistake_type: str) -> str:
-        """Generate unique rule ID from mistake type"""
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _generate_rule_id(mistake_type: str) -> str:
+        """Generate unique rule ID from mistake type (memoized, types are a closed set)"""
         return hashlib.md5(mistake_type.encode()).hexdigest()[:8]
@@ -1,11 +1,120 @@
 """
 Planner Agent - Creates step-by-step research plans
 """
-from groq import Groq
+from string import Template
+import functools
+import re
 from typing import List, Optional
 from schemas import ResearchPlan, PlanStep, LearningRule
+from memory.mistake_store import MistakeStore, get_store
+from groq_client import get_groq_client
+from llm_cache import cached_chat, invalidate_chat
 import config
-import json
+
+
+# Prompt templates, compiled once; only the question and the learned
+# constraints vary between calls
+
+# VERY WEAK - Almost no guidance
+_VERY_WEAK_PROMPT = Template("""Question: $question
+
+You likely know this already. Create a quick 1-step plan.
+
+Return JSON: {"question": "$question", "steps": [{"step_number": 1, "description": "answer", "tool_required": null, "reasoning": "know it"}], "estimated_time": "instant"}""")
+
+# WEAK - Mentions tools but doesn't require them
+_WEAK_PROMPT = Template("""Question: $question
+
+Create a plan. You can use web_search or summarize if needed, or answer directly.
+
+$constraints
+
+Return JSON: {"question": "$question", "steps": [{"step_number": 1, "description": "step", "tool_required": "tool or null", "reasoning": "why"}], "estimated_time": "1 min"}""")
+
+# STRONG - Explicit requirements + learned rules
+_STRONG_PROMPT = Template("""You are an expert research planning assistant.
+
+TASK: Create a step-by-step plan to answer: "$question"
+
+AVAILABLE TOOLS:
+- web_search: Search the web for information
+- summarize: Extract key information from search results
+
+$constraints
+
+$reminder
+
+Return a JSON plan with this structure:
+{
+    "question": "the question",
+    "steps": [
+        {
+            "step_number": 1,
+            "description": "what to do",
+            "tool_required": "tool_name or null",
+            "reasoning": "why needed"
+        }
+    ],
+    "estimated_time": "estimate"
+}
+
+Create 3-5 steps. Return ONLY valid JSON.""")
+
+_LEARNED_REMINDER = "IMPORTANT: Follow the learned constraints above strictly."
+
+# Adaptive system message based on learning
+_LEARNED_SYSTEM_MSG = "You are a research planning expert. Always return valid JSON. Follow learned constraints strictly."
+_DEFAULT_SYSTEM_MSG = "You are a helpful assistant. Return valid JSON."
+
+# Markdown code fence around a JSON reply (rare in JSON mode, kept as a fallback)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+
+def _parse_plan(content: str) -> ResearchPlan:
+    """Parse and validate a planning reply, unwrapping a markdown fence if present"""
+    content = content.strip()
+    
+    # Extract JSON from markdown code blocks if present
+    fence = _FENCE_RE.search(content)
+    if fence:
+        content = fence.group(1)
+    
+    # Parse and validate in one pass with pydantic-core
+    return ResearchPlan.model_validate_json(content)
+
+
+def _prompt_level(run_count: int) -> int:
+    """Map run count to prompt strength: 0 = very weak, 1 = weak, 2 = strong"""
+    if run_count < 2:
+        return 0
+    if run_count < 4:
+        return 1
+    return 2
+
+
+@functools.lru_cache(maxsize=64)
+def _prompt_scaffold(level: int, constraints: str) -> Template:
+    """
+    Pre-render a planning prompt with everything except the question
+    
+    Args:
+        level: Prompt strength from _prompt_level
+        constraints: Rendered learned-constraints block ("" if none)
+        
+    Returns:
+        Template whose only placeholder is $question
+    """
+    # Escape "$" so rule text can't be read as a placeholder in the scaffold
+    escaped = constraints.replace("$", "$$")
+    
+    if level == 0:
+        return _VERY_WEAK_PROMPT
+    if level == 1:
+        return Template(_WEAK_PROMPT.safe_substitute(constraints=escaped))
+    return Template(_STRONG_PROMPT.safe_substitute(
+        constraints=escaped,
+        reminder=_LEARNED_REMINDER if constraints else ""
+    ))
 
 
 class PlannerAgent:
@@ -14,16 +123,50 @@ class PlannerAgent:
     Accepts learned constraints to improve planning over time.
     """
     
-    def __init__(self):
+    def __init__(self, mistake_store: Optional[MistakeStore] = None):
         if not config.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY not set")
         
-        self.client = Groq(api_key=config.GROQ_API_KEY)
+        self.client = get_groq_client()
         self.learned_rules: List[LearningRule] = []
+        self._constraints = ""
+        
+        # Run count drives prompt strength; read once, then tracked in memory
+        store = mistake_store or get_store()
+        self._run_count = store.get_stats()["total_runs"]
+        
+        # Request behind each outstanding plan, by question, so a plan that
+        # fails evaluation can be dropped from the LLM cache
+        self._plan_requests = {}
     
     def inject_learning(self, rules: List[LearningRule]):
         """Inject learned rules that modify planning behavior"""
         self.learned_rules = [r for r in rules if r.applies_to == "planning"]
+        
+        # Render the constraints block once, not on every plan
+        self._constraints = ""
+        if self.learned_rules:
+            lines = ["\n\n🧠 LEARNED CONSTRAINTS (follow these strictly):\n"]
+            lines.extend(
+                f"- {rule.rule_text}\n"
+                for rule in sorted(self.learned_rules, key=lambda r: r.priority, reverse=True)
+            )
+            self._constraints = "".join(lines)
+    
+    def note_run_completed(self):
+        """Record that a research run finished, advancing the prompt strength level"""
+        self._run_count += 1
+    
+    def note_plan_outcome(self, question: str, passed: bool):
+        """
+        Record whether the plan for a question passed evaluation
+        
+        A rejected plan's cached reply is dropped, so the next run with the
+        same prompt samples a new plan instead of replaying the failed one.
+        """
+        request = self._plan_requests.pop(question, None)
+        if request is not None and not passed:
+            invalidate_chat(**request)
     
     def create_plan(self, question: str) -> ResearchPlan:
         """
@@ -35,106 +178,40 @@ class PlannerAgent:
         Returns:
             ResearchPlan with steps and tool requirements
         """
-        # Build constraints from learned rules
-        constraints = ""
-        if self.learned_rules:
-            constraints = "\n\n🧠 LEARNED CONSTRAINTS (follow these strictly):\n"
-            for rule in sorted(self.learned_rules, key=lambda r: r.priority, reverse=True):
-                constraints += f"- {rule.rule_text}\n"
-        
         # Progressive prompt strengthening based on runs + learning
         # Runs 1-2: Very weak (fails consistently)
         # Runs 3-4: Medium (+ learned rules)
         # Runs 5+: Strong (+ all learned rules)
         
-        # Get run count from memory
-        from memory import MistakeStore
-        stats = MistakeStore().get_stats()
-        run_count = stats['total_runs']
-        
         has_learned = len(self.learned_rules) > 0
         
-        # Determine prompt strength level
-        if run_count < 2:
-            # VERY WEAK - Almost no guidance
-            prompt = f"""Question: {question}
-
-You likely know this already. Create a quick 1-step plan.
-
-Return JSON: {{\"question\": \"{question}\", \"steps\": [{{\"step_number\": 1, \"description\": \"answer\", \"tool_required\": null, \"reasoning\": \"know it\"}}], \"estimated_time\": \"instant\"}}"""
-            
-        elif run_count < 4:
-            # WEAK - Mentions tools but doesn't require them
-            prompt = f"""Question: {question}
-
-Create a plan. You can use web_search or summarize if needed, or answer directly.
-
-{constraints if has_learned else ""}
-
-Return JSON: {{\"question\": \"{question}\", \"steps\": [{{\"step_number\": 1, \"description\": \"step\", \"tool_required\": \"tool or null\", \"reasoning\": \"why\"}}], \"estimated_time\": \"1 min\"}}"""
-            
-        else:
-            # STRONG - Explicit requirements + learned rules
-            prompt = f"""You are an expert research planning assistant.
-
-TASK: Create a step-by-step plan to answer: "{question}"
-
-AVAILABLE TOOLS:
-- web_search: Search the web for information
-- summarize: Extract key information from search results
-
-{constraints}
-
-{("IMPORTANT: Follow the learned constraints above strictly." if has_learned else "")}
-
-Return a JSON plan with this structure:
-{{
-    "question": "the question",
-    "steps": [
-        {{
-            "step_number": 1,
-            "description": "what to do",
-            "tool_required": "tool_name or null",
-            "reasoning": "why needed"
-        }}
-    ],
-    "estimated_time": "estimate"
-}}
-
-Create 3-5 steps. Return ONLY valid JSON."""
+        # Everything but the question is fixed per (level, constraints)
+        scaffold = _prompt_scaffold(_prompt_level(self._run_count), self._constraints)
+        prompt = scaffold.substitute(question=question)
+        
+        system_msg = _LEARNED_SYSTEM_MSG if has_learned else _DEFAULT_SYSTEM_MSG
+        
+        request = dict(
+            model=config.GROQ_STRUCTURED_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_msg
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=config.GROQ_TEMPERATURE,
+            max_tokens=config.GROQ_MAX_TOKENS,
+            response_format={"type": "json_object"}  # JSON mode: no prose or fences around the plan
+        )
+        self._plan_requests[question] = request
         
         try:
-            # Adaptive system message based on learning
-            system_msg = ("You are a research planning expert. Always return valid JSON. Follow learned constraints strictly." 
-                         if has_learned 
-                         else "You are a helpful assistant. Return valid JSON.")
-            
-            response = self.client.chat.completions.create(
-                model=config.GROQ_STRUCTURED_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_msg
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=config.GROQ_TEMPERATURE,
-                max_tokens=config.GROQ_MAX_TOKENS
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Extract JSON from markdown code blocks if present
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            plan_data = json.loads(content)
-            return ResearchPlan(**plan_data)
+            # Only a reply that parses into a plan is cached
+            return cached_chat(self.client, parse=_parse_plan, **request)
         
         except Exception as e:
             print(f"⚠️  Planning error: {e}")
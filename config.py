@@ -13,14 +13,27 @@ GROQ_MAX_TOKENS = 2048
 # Model for structured outputs (more reliable for JSON)
 GROQ_STRUCTURED_MODEL = "llama-3.3-70b-versatile"
 
+# Connection pool shared by all agents (HTTP/2 is used when "h2" is installed)
+GROQ_MAX_KEEPALIVE_CONNECTIONS = 32
+GROQ_MAX_CONNECTIONS = 64
+
+# Maximum questions in flight at once for batch research (bounded by Groq rate limits)
+MAX_CONCURRENT_REQUESTS = 4
+
 # Tool Configuration
 WEB_SEARCH_MAX_RESULTS = 5
 SUMMARIZATION_MAX_LENGTH = 500
+EXECUTOR_MAX_WORKERS = 4  # Threads for overlapping search/summarize with answer generation
 
 # Memory Configuration
 PROJECT_ROOT = Path(__file__).parent
 DATA_DIR = PROJECT_ROOT / "data"
 MISTAKES_FILE = DATA_DIR / "mistakes.json"
+MISTAKES_PRETTY_JSON = False  # Indent mistakes.json for reading/debugging (larger, slower writes)
+
+# LLM Cache Configuration
+LLM_CACHE_ENABLED = True  # Reuse completions for identical requests
+LLM_CACHE_FILE = DATA_DIR / "llm_cache.db"
 
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
@@ -28,6 +41,7 @@ DATA_DIR.mkdir(exist_ok=True)
 # Logging Configuration
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+CONSOLE_LOG_FORMAT = "%(message)s"  # Agent progress lines shown in the CLI
 
 # Evaluation Criteria
 REQUIRED_TOOLS = ["web_search"]  # Must be used for research tasks
@@ -0,0 +1,32 @@
+"""
+Shared Groq client - One connection pool reused by every agent and tool
+"""
+import functools
+import httpx
+from groq import Groq
+import config
+
+# HTTP/2 needs the optional "h2" package; fall back to HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+@functools.lru_cache(maxsize=1)
+def get_groq_client() -> Groq:
+    """
+    Get the process-wide Groq client, creating it on first use
+
+    Returns:
+        Groq client backed by a persistent httpx connection pool
+    """
+    http_client = httpx.Client(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_keepalive_connections=config.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=config.GROQ_MAX_CONNECTIONS
+        )
+    )
+    return Groq(api_key=config.GROQ_API_KEY, http_client=http_client)
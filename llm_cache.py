@@ -0,0 +1,152 @@
+"""
+LLM Cache - Persistent exact-match cache for Groq chat completions
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+import config
+
+log = logging.getLogger(__name__)
+
+
+class SQLiteLLMCache:
+    """
+    Stores chat completion contents in a local SQLite database,
+    keyed by a hash of the full request (model, messages, sampling params)
+    """
+
+    def __init__(self, filepath: Path = None):
+        self.filepath = filepath or config.LLM_CACHE_FILE
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.filepath), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Build a stable cache key from chat completion arguments"""
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached completion content, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        """Store completion content under the given key"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+                (key, value)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove the completion stored under the given key, if any"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all cached completions"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+_default_cache: Optional[SQLiteLLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> SQLiteLLMCache:
+    """Get the process-wide LLM cache, creating it on first use"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SQLiteLLMCache()
+        return _default_cache
+
+
+def cached_chat(client, parse: Optional[Callable[[str], Any]] = None, **kwargs) -> Any:
+    """
+    Drop-in replacement for client.chat.completions.create that
+    returns the completion content, served from cache when possible
+
+    A reply is only cached once parse accepts it, so a malformed reply is
+    retried on the next call instead of being replayed. Cache errors
+    (e.g. a database locked by another process) count as a miss.
+
+    Args:
+        client: Groq client used on a cache miss
+        parse: Optional parser/validator for the content; its result is
+            returned, and any exception it raises propagates uncached
+        **kwargs: Arguments forwarded to chat.completions.create
+
+    Returns:
+        Completion message content, or parse(content) if parse is given
+    """
+    cache = None
+    key = None
+    if config.LLM_CACHE_ENABLED:
+        try:
+            cache = get_llm_cache()
+            key = cache.make_key(**kwargs)
+            content = cache.get(key)
+        except Exception as e:
+            log.warning("LLM cache read failed, calling the API: %s", e)
+            cache = None
+            content = None
+
+        if content is not None:
+            try:
+                return parse(content) if parse else content
+            except Exception:
+                pass  # Entry no longer parses: treat it as a miss
+
+    response = client.chat.completions.create(**kwargs)
+    content = response.choices[0].message.content
+    result = parse(content) if parse else content
+
+    if cache is not None and content is not None:
+        try:
+            cache.set(key, content)
+        except Exception as e:
+            log.warning("LLM cache write failed: %s", e)
+
+    return result
+
+
+def invalidate_chat(**kwargs):
+    """
+    Drop the cached reply for a request, so the next identical call
+    samples a new completion (cache errors are logged and ignored)
+
+    Args:
+        **kwargs: The same arguments that were passed to cached_chat
+    """
+    if not config.LLM_CACHE_ENABLED:
+        return
+
+    try:
+        cache = get_llm_cache()
+        cache.delete(cache.make_key(**kwargs))
+    except Exception as e:
+        log.warning("LLM cache invalidation failed: %s", e)
+
+
+def clear_llm_cache():
+    """Remove every cached completion (cache errors are logged and ignored)"""
+    try:
+        get_llm_cache().clear()
+    except Exception as e:
+        log.warning("LLM cache clear failed: %s", e)
@@ -4,6 +4,13 @@ Main application orchestrating the learning loop
 """
 import sys
 import os
+import asyncio
+import atexit
+import contextvars
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import List
 from dotenv import load_dotenv
 from colorama import init, Fore, Style
 import argparse
@@ -14,10 +21,85 @@ load_dotenv()
 # Initialize colorama for Windows
 init(autoreset=True)
 
-from agents import PlannerAgent, ExecutorAgent, EvaluatorAgent, LearnerAgent
-from memory import MistakeStore, BehaviorModifier
+from memory import BehaviorModifier, get_store
+from llm_cache import clear_llm_cache
 import config
 
+# Pre-composed colored console strings reused on every run
+SEPARATOR = f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}"
+DEMO_SEPARATOR = f"{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}"
+QUESTION_LABEL = f"{Fore.GREEN}🔬 RESEARCH QUESTION:{Style.RESET_ALL}"
+PLANNING_HEADER = f"{Fore.YELLOW}📋 STEP 1: PLANNING{Style.RESET_ALL}"
+EXECUTION_HEADER = f"{Fore.YELLOW}⚙️  STEP 2: EXECUTION{Style.RESET_ALL}"
+ANSWER_HEADER = f"{Fore.GREEN}💡 FINAL ANSWER:{Style.RESET_ALL}"
+EVALUATION_HEADER = f"{Fore.YELLOW}📊 STEP 3: EVALUATION{Style.RESET_ALL}"
+LEARNING_HEADER = f"{Fore.YELLOW}🧠 STEP 4: LEARNING FROM MISTAKES{Style.RESET_ALL}"
+MISTAKES_SAVED = f"{Fore.GREEN}✓ Mistakes saved to memory{Style.RESET_ALL}"
+NO_MISTAKES = f"{Fore.GREEN}✓ No mistakes detected - execution was successful!{Style.RESET_ALL}"
+PROGRESS_HEADER = f"{Fore.CYAN}📈 LEARNING PROGRESS:{Style.RESET_ALL}"
+
+
+def _write_lines(lines: List[str]):
+    """Write buffered console lines with a single stdout write, then clear them"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    lines.clear()
+
+
+_log_queue = None
+
+# Label of the batch question whose pipeline is running in this context ("" outside batches)
+_batch_label = contextvars.ContextVar("batch_label", default="")
+
+
+class _BatchLabelFilter(logging.Filter):
+    """Prefix agent log lines with the batch question they belong to"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        label = _batch_label.get()
+        if label:
+            message = record.getMessage()
+            body = message.lstrip("\n")
+            record.msg = f"{message[:len(message) - len(body)]}{label} {body}"
+            record.args = None
+        return True
+
+
+def setup_logging():
+    """
+    Route agent progress logs through a queue drained by a background
+    thread, so agents never block on terminal writes
+    """
+    global _log_queue
+    
+    logger = logging.getLogger("agents")
+    if logger.handlers:
+        return
+    
+    log_queue = queue.Queue(-1)
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(config.CONSOLE_LOG_FORMAT))
+    
+    listener = QueueListener(log_queue, console)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # Filters run in the logging thread, where the batch label is set
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(_BatchLabelFilter())
+    logger.addHandler(queue_handler)
+    logger.setLevel(config.LOG_LEVEL)
+    logger.propagate = False
+    _log_queue = log_queue
+
+
+def flush_logs():
+    """Wait until queued agent logs are written, to keep console output ordered"""
+    if _log_queue is not None:
+        _log_queue.join()
+
+
+setup_logging()
+
 
 class ResearchAgent:
     """
@@ -34,11 +116,14 @@ class ResearchAgent:
             print(f"\nGet your key from: https://console.groq.com/keys")
             sys.exit(1)
         
+        # Imported here so --stats / --clear-memory don't load Groq and search clients
+        from agents import PlannerAgent, ExecutorAgent, EvaluatorAgent, LearnerAgent
+        
         # Initialize memory first
-        self.memory = MistakeStore()
+        self.memory = get_store()
         
         # Initialize agents
-        self.planner = PlannerAgent()
+        self.planner = PlannerAgent(mistake_store=self.memory)
         self.executor = ExecutorAgent()  # No more mistake_probability!
         self.evaluator = EvaluatorAgent()
         self.learner = LearnerAgent()
@@ -70,67 +155,78 @@ class ResearchAgent:
         Returns:
             Dict with results and learning status
         """
-        print(f"\n{Fore.CYAN}{'='*70}{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}🔬 RESEARCH QUESTION:{Style.RESET_ALL} {question}")
-        print(f"{Fore.CYAN}{'='*70}{Style.RESET_ALL}\n")
+        # Console lines are buffered per phase and written in one call
+        out = [
+            f"\n{SEPARATOR}",
+            f"{QUESTION_LABEL} {question}",
+            f"{SEPARATOR}\n",
+        ]
         
         # Step 1: Plan
-        print(f"{Fore.YELLOW}📋 STEP 1: PLANNING{Style.RESET_ALL}")
+        out.append(PLANNING_HEADER)
+        _write_lines(out)
         plan = self.planner.create_plan(question)
         
-        print(f"\nPlan created with {len(plan.steps)} steps:")
+        out.append(f"\nPlan created with {len(plan.steps)} steps:")
         for step in plan.steps:
             tool_info = f"[{step.tool_required}]" if step.tool_required else "[no tool]"
-            print(f"  {step.step_number}. {step.description} {Fore.BLUE}{tool_info}{Style.RESET_ALL}")
+            out.append(f"  {step.step_number}. {step.description} {Fore.BLUE}{tool_info}{Style.RESET_ALL}")
         
         # Step 2: Execute
-        print(f"\n{Fore.YELLOW}⚙️  STEP 2: EXECUTION{Style.RESET_ALL}")
+        out.append(f"\n{EXECUTION_HEADER}")
+        _write_lines(out)
         trace = self.executor.execute_plan(plan)
+        flush_logs()
         
-        print(f"\n{Fore.GREEN}💡 FINAL ANSWER:{Style.RESET_ALL}")
-        print(f"{trace.final_answer}\n")
+        out.append(f"\n{ANSWER_HEADER}")
+        out.append(f"{trace.final_answer}\n")
         
         # Step 3: Evaluate
-        print(f"{Fore.YELLOW}📊 STEP 3: EVALUATION{Style.RESET_ALL}")
+        out.append(EVALUATION_HEADER)
+        _write_lines(out)
         evaluation = self.evaluator.evaluate(trace)
         
-        print(f"\n{evaluation.feedback}")
-        print(f"Score: {evaluation.score:.1%}")
-        print(f"✓ Required tools used: {evaluation.required_tools_used}")
-        print(f"✓ Correct sequence: {evaluation.correct_sequence_followed}")
-        print(f"✓ Answer supported: {evaluation.answer_supported_by_data}")
+        out.append(f"\n{evaluation.feedback}")
+        out.append(f"Score: {evaluation.score:.1%}")
+        out.append(f"✓ Required tools used: {evaluation.required_tools_used}")
+        out.append(f"✓ Correct sequence: {evaluation.correct_sequence_followed}")
+        out.append(f"✓ Answer supported: {evaluation.answer_supported_by_data}")
         
         # Step 4: Learn (if failed)
         learned_something = False
         if not evaluation.passed:
-            print(f"\n{Fore.YELLOW}🧠 STEP 4: LEARNING FROM MISTAKES{Style.RESET_ALL}")
+            out.append(f"\n{LEARNING_HEADER}")
+            _write_lines(out)
             mistakes = self.learner.analyze_failure(trace, evaluation)
             
             if mistakes:
-                print(f"\nIdentified {len(mistakes)} mistake(s):")
+                out.append(f"\nIdentified {len(mistakes)} mistake(s):")
                 for mistake in mistakes:
-                    print(f"  • {Fore.RED}{mistake.mistake_type}{Style.RESET_ALL}: {mistake.description}")
-                    print(f"    → Learning: {Fore.GREEN}{mistake.corrective_rule}{Style.RESET_ALL}")
+                    out.append(f"  • {Fore.RED}{mistake.mistake_type}{Style.RESET_ALL}: {mistake.description}")
+                    out.append(f"    → Learning: {Fore.GREEN}{mistake.corrective_rule}{Style.RESET_ALL}")
                 
                 # Save to memory
                 self.memory.add_mistakes(mistakes)
                 learned_something = True
                 
-                print(f"\n{Fore.GREEN}✓ Mistakes saved to memory{Style.RESET_ALL}")
+                out.append(f"\n{MISTAKES_SAVED}")
         else:
-            print(f"\n{Fore.GREEN}✓ No mistakes detected - execution was successful!{Style.RESET_ALL}")
+            out.append(f"\n{NO_MISTAKES}")
         
         # Update statistics
         self.memory.update_stats(success=evaluation.passed)
+        self.planner.note_plan_outcome(question, evaluation.passed)
+        self.planner.note_run_completed()
         
         # Show learning progress
         stats = self.memory.get_stats()
-        print(f"\n{Fore.CYAN}📈 LEARNING PROGRESS:{Style.RESET_ALL}")
-        print(f"   Total runs: {stats['total_runs']}")
-        print(f"   Success rate: {stats['success_rate']:.1f}%")
-        print(f"   Patterns learned: {stats['recurring_patterns']}")
+        out.append(f"\n{PROGRESS_HEADER}")
+        out.append(f"   Total runs: {stats['total_runs']}")
+        out.append(f"   Success rate: {stats['success_rate']:.1f}%")
+        out.append(f"   Patterns learned: {stats['recurring_patterns']}")
         
-        print(f"\n{Fore.CYAN}{'='*70}{Style.RESET_ALL}\n")
+        out.append(f"\n{SEPARATOR}\n")
+        _write_lines(out)
         
         return {
             "question": question,
@@ -140,6 +236,112 @@ class ResearchAgent:
             "learned": learned_something,
             "stats": stats
         }
+    
+    async def _run_pipeline(self, label: str, question: str, semaphore: asyncio.Semaphore):
+        """Run Plan → Execute → Evaluate for one question off the event loop"""
+        loop = asyncio.get_running_loop()
+        
+        # Each gathered task has its own context; carry its label into the
+        # worker threads so agent logs show which question they belong to
+        _batch_label.set(label)
+        context = contextvars.copy_context()
+        
+        async with semaphore:
+            plan = await loop.run_in_executor(None, context.run, self.planner.create_plan, question)
+            trace = await loop.run_in_executor(None, context.run, self.executor.execute_plan, plan)
+            evaluation = await loop.run_in_executor(None, context.run, self.evaluator.evaluate, trace)
+        
+        return trace, evaluation
+    
+    def research_batch(self, questions: List[str]) -> List[dict]:
+        """
+        Research several questions concurrently
+        
+        Planning, execution and evaluation overlap across questions (bounded by
+        config.MAX_CONCURRENT_REQUESTS); learning and stats updates are applied
+        afterwards, one question at a time, so memory writes never race.
+        Progress lines are labelled [Q1], [Q2], ... by question, and a question
+        whose pipeline raises is reported as failed without affecting the rest.
+        
+        Args:
+            questions: Research questions to answer
+            
+        Returns:
+            List of result dicts, in the same order as questions
+        """
+        labels = [f"[Q{i}]" for i in range(1, len(questions) + 1)]
+        
+        async def run_all():
+            semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
+            return await asyncio.gather(
+                *[
+                    self._run_pipeline(label, question, semaphore)
+                    for label, question in zip(labels, questions)
+                ],
+                return_exceptions=True
+            )
+        
+        print(f"\n{SEPARATOR}")
+        print(f"{Fore.GREEN}🔬 RESEARCHING {len(questions)} QUESTIONS{Style.RESET_ALL}")
+        for label, question in zip(labels, questions):
+            print(f"   {label} {question}")
+        print(f"{SEPARATOR}\n")
+        
+        outcomes = asyncio.run(run_all())
+        flush_logs()
+        
+        results = []
+        for label, question, outcome in zip(labels, questions, outcomes):
+            if isinstance(outcome, BaseException):
+                # The pipeline crashed: nothing was evaluated, so nothing to learn
+                self.planner.note_plan_outcome(question, False)
+                print(f"\n{Fore.RED}✗ {label} {question}{Style.RESET_ALL} (error: {outcome})")
+                results.append({
+                    "question": question,
+                    "answer": None,
+                    "passed": False,
+                    "score": 0.0,
+                    "learned": False,
+                    "error": str(outcome)
+                })
+                continue
+            
+            trace, evaluation = outcome
+            learned_something = False
+            if not evaluation.passed:
+                mistakes = self.learner.analyze_failure(trace, evaluation)
+                if mistakes:
+                    self.memory.add_mistakes(mistakes)
+                    learned_something = True
+            
+            self.memory.update_stats(success=evaluation.passed)
+            self.planner.note_plan_outcome(question, evaluation.passed)
+            self.planner.note_run_completed()
+            
+            status = f"{Fore.GREEN}✓" if evaluation.passed else f"{Fore.RED}✗"
+            print(f"\n{status} {label} {question}{Style.RESET_ALL} (score: {evaluation.score:.1%})")
+            print(f"{trace.final_answer}")
+            
+            results.append({
+                "question": question,
+                "answer": trace.final_answer,
+                "passed": evaluation.passed,
+                "score": evaluation.score,
+                "learned": learned_something
+            })
+        
+        stats = self.memory.get_stats()
+        for result in results:
+            result["stats"] = stats
+        
+        print(f"\n{PROGRESS_HEADER}")
+        print(f"   Total runs: {stats['total_runs']}")
+        print(f"   Success rate: {stats['success_rate']:.1f}%")
+        print(f"   Patterns learned: {stats['recurring_patterns']}")
+        
+        print(f"\n{SEPARATOR}\n")
+        
+        return results
 
 
 def main():
@@ -152,6 +354,12 @@ def main():
         nargs="?",
         help="Research question to answer"
     )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="QUESTION",
+        help="Research several questions concurrently"
+    )
     parser.add_argument(
         "--demo",
         action="store_true",
@@ -171,14 +379,15 @@ def main():
     
     # Clear memory if requested
     if args.clear_memory:
-        store = MistakeStore()
+        store = get_store()
         store.clear()
+        clear_llm_cache()  # Cached plans were shaped by the cleared mistakes
         print(f"{Fore.GREEN}✓ Memory cleared{Style.RESET_ALL}")
         return
     
     # Show stats if requested
     if args.stats:
-        store = MistakeStore()
+        store = get_store()
         stats = store.get_stats()
         print(f"\n{Fore.CYAN}📊 LEARNING STATISTICS{Style.RESET_ALL}")
         print(f"Total runs: {stats['total_runs']}")
@@ -194,6 +403,12 @@ def main():
         run_demo()
         return
     
+    # Run batch research
+    if args.batch:
+        agent = ResearchAgent()
+        agent.research_batch(args.batch)
+        return
+    
     # Check if question provided
     if not args.question:
         parser.print_help()
@@ -208,9 +423,9 @@ def run_demo():
     """
     Run demonstration showing learning progression
     """
-    print(f"\n{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}")
+    print(f"\n{DEMO_SEPARATOR}")
     print(f"{Fore.MAGENTA}🎓 SELF-IMPROVING AGENT DEMONSTRATION{Style.RESET_ALL}")
-    print(f"{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}\n")
+    print(f"{DEMO_SEPARATOR}\n")
     
     print("This demo shows how the agent learns from mistakes.\n")
     print(f"{Fore.YELLOW}Phase 1:{Style.RESET_ALL} Agent will make mistakes (high error rate)")
@@ -220,8 +435,9 @@ def run_demo():
     input(f"{Fore.CYAN}Press Enter to start...{Style.RESET_ALL}")
     
     # Clear memory for fresh demo
-    store = MistakeStore()
+    store = get_store()
     store.clear()
+    clear_llm_cache()
     
     questions = [
         "What is the capital of France?",
@@ -230,9 +446,9 @@ def run_demo():
     ]
     
     # Phase 1: Initial runs with weak prompts
-    print(f"\n{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}")
+    print(f"\n{DEMO_SEPARATOR}")
     print(f"{Fore.MAGENTA}PHASE 1: INITIAL RUNS (Weak Prompts - Natural Mistakes){Style.RESET_ALL}")
-    print(f"{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}")
+    print(DEMO_SEPARATOR)
     
     agent_v1 = ResearchAgent()
     
@@ -241,9 +457,9 @@ def run_demo():
         input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}\n")
     
     # Phase 2: Learning
-    print(f"\n{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}")
+    print(f"\n{DEMO_SEPARATOR}")
     print(f"{Fore.MAGENTA}📚 LEARNING PHASE{Style.RESET_ALL}")
-    print(f"{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}\n")
+    print(f"{DEMO_SEPARATOR}\n")
     
     snapshot = store.load()
     print(f"Mistakes in memory: {len(snapshot.mistakes)}\n")
@@ -256,9 +472,9 @@ def run_demo():
     input(f"{Fore.CYAN}Press Enter to see improved performance...{Style.RESET_ALL}\n")
     
     # Phase 3: Improved performance with learned constraints
-    print(f"\n{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}")
+    print(f"\n{DEMO_SEPARATOR}")
     print(f"{Fore.MAGENTA}PHASE 3: IMPROVED RUNS (Strong Prompts + Learned Rules){Style.RESET_ALL}")
-    print(f"{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}")
+    print(DEMO_SEPARATOR)
     
     agent_v2 = ResearchAgent()  # Will load learned rules
     
@@ -267,9 +483,9 @@ def run_demo():
         input(f"\n{Fore.CYAN}Press Enter to continue...{Style.RESET_ALL}\n")
     
     # Final stats
-    print(f"\n{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}")
+    print(f"\n{DEMO_SEPARATOR}")
     print(f"{Fore.MAGENTA}📊 FINAL STATISTICS{Style.RESET_ALL}")
-    print(f"{Fore.MAGENTA}{'='*70}{Style.RESET_ALL}\n")
+    print(f"{DEMO_SEPARATOR}\n")
     
     stats = store.get_stats()
     print(f"Total runs: {stats['total_runs']}")
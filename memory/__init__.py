@@ -1,7 +1,7 @@
 """
 Memory module - Persistent storage and learning
 """
-from .mistake_store import MistakeStore
+from .mistake_store import MistakeStore, get_store
 from .behavior_modifier import BehaviorModifier
 
-__all__ = ["MistakeStore", "BehaviorModifier"]
+__all__ = ["MistakeStore", "BehaviorModifier", "get_store"]
@@ -3,7 +3,6 @@ Behavior Modifier - Converts mistakes into planning constraints
 """
 from typing import List
 from schemas import Mistake, LearningRule
-from agents.learner import LearnerAgent
 
 
 class BehaviorModifier:
@@ -13,6 +12,8 @@ class BehaviorModifier:
     """
     
     def __init__(self):
+        # Deferred: importing agents loads every agent and its API clients
+        from agents.learner import LearnerAgent
         self.learner = LearnerAgent()
     
     def generate_constraints(self, mistakes: List[Mistake]) -> List[LearningRule]:
@@ -51,8 +52,9 @@ class BehaviorModifier:
         if not planning_rules:
             return "No planning constraints yet."
         
-        reminders = "🧠 Learned Constraints:\n"
-        for i, rule in enumerate(sorted(planning_rules, key=lambda r: r.priority, reverse=True), 1):
-            reminders += f"{i}. {rule.rule_text} (priority: {rule.priority})\n"
-        
-        return reminders
+        lines = ["🧠 Learned Constraints:\n"]
+        lines.extend(
+            f"{i}. {rule.rule_text} (priority: {rule.priority})\n"
+            for i, rule in enumerate(sorted(planning_rules, key=lambda r: r.priority, reverse=True), 1)
+        )
+        return "".join(lines)
@@ -1,12 +1,71 @@
 """
 Mistake Store - Persistent JSON storage for mistakes
 """
-import json
+import functools
+import heapq
+import mmap
+import orjson
+import os
+import pickle
+import sys
+import tempfile
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from schemas import Mistake, MemorySnapshot
 import config
 
+# Process umask, read once (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _atomic_write(path: str, payload: bytes) -> Tuple[int, int, int]:
+    """
+    Write a file via a temp file and rename, so readers never see a partial write
+    
+    Returns:
+        Version of the written file (see _file_version), taken from the
+        temp file itself so a concurrent replace can't be mistaken for it
+    """
+    # A unique temp file per write: concurrent writers never share one
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".",
+        prefix=os.path.basename(path) + ".",
+        suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            # The rename keeps inode, size and mtime
+            version = _stat_version(os.fstat(f.fileno()))
+        # mkstemp creates the file 0600; give it the usual permissions
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    
+    return version
+
+
+def _file_version(path: str) -> Tuple[int, int, int]:
+    """
+    Identify a version of a file by (mtime_ns, size, inode)
+    
+    mtime alone is tick-granular; every write replaces the inode via
+    os.replace, so two writes within one tick still differ.
+    """
+    return _stat_version(os.stat(path))
+
+
+def _stat_version(st: os.stat_result) -> Tuple[int, int, int]:
+    """Build a file version from a stat result"""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
 
 class MistakeStore:
     """
@@ -15,28 +74,111 @@ class MistakeStore:
     
     def __init__(self, filepath: Path = None):
         self.filepath = filepath or config.MISTAKES_FILE
-        self._ensure_file_exists()
+        
+        # Binary sidecar of the parsed JSON, so a fresh process can skip parsing;
+        # the JSON file stays the source of truth
+        self.cache_path = self.filepath.with_suffix(".cache")
+        
+        # Plain string paths for the hot I/O calls, converted once
+        self._fspath = os.fspath(self.filepath)
+        self._cache_fspath = os.fspath(self.cache_path)
+        
+        # Last read/written file contents, valid while the file's version is
+        # unchanged; every load() builds a fresh snapshot from them
+        self._data: Optional[Dict[str, Any]] = None
+        self._version: Optional[Tuple[int, int, int]] = None
     
     def _ensure_file_exists(self):
         """Create empty mistakes file if it doesn't exist"""
-        if not self.filepath.exists():
+        if not os.path.exists(self._fspath):
             initial_data = {
                 "mistakes": [],
                 "version": "1.0",
                 "total_runs": 0,
                 "successful_runs": 0
             }
-            self.filepath.write_text(json.dumps(initial_data, indent=2))
+            _atomic_write(self._fspath, self._dumps(initial_data))
+    
+    @staticmethod
+    def _dumps(data: Dict[str, Any]) -> bytes:
+        """Serialize store contents: compact by default, indented if configured"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if config.MISTAKES_PRETTY_JSON else 0)
+    
+    def _read_data(self) -> Dict[str, Any]:
+        """Read the raw JSON contents, reusing the cached copy if the file is unchanged"""
+        try:
+            version = _file_version(self._fspath)
+        except FileNotFoundError:
+            # First use: create the file only now, instead of on every construction
+            self._ensure_file_exists()
+            version = _file_version(self._fspath)
+        
+        if self._data is None or version != self._version:
+            # Reads never refresh the sidecar (so read-only commands like
+            # --stats don't write to data/); writes keep it current
+            data = self._read_cache(version)
+            if data is None:
+                with open(self._fspath, "rb") as f:
+                    data = orjson.loads(f.read())
+            
+            # Strings parsed from the file are new objects on every load;
+            # interning them makes each mistake type the same object as the
+            # MistakeType constant (literals are interned at compile time),
+            # so dedupe keys and per-type grouping hit the identity fast path
+            for record in data.get("mistakes", []):
+                mistake_type = record.get("mistake_type")
+                if isinstance(mistake_type, str):
+                    record["mistake_type"] = sys.intern(mistake_type)
+            
+            self._data = data
+            self._version = version
+        return self._data
+    
+    def _read_cache(self, version: Tuple[int, int, int]) -> Optional[Dict[str, Any]]:
+        """Read the sidecar if it was written for this version of the JSON file"""
+        try:
+            with open(self._cache_fspath, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                cached_version, data = pickle.loads(buf)
+        except Exception:
+            return None  # Missing, empty or corrupt: fall back to the JSON file
+        
+        return data if cached_version == version else None
+    
+    def _write_cache(self, data: Dict[str, Any], version: Tuple[int, int, int]):
+        """Refresh the sidecar for the given JSON file version (best effort)"""
+        try:
+            _atomic_write(self._cache_fspath, pickle.dumps((version, data), protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            print(f"⚠️  Error writing mistakes cache: {e}")
+    
+    def _write_data(self, data: Dict[str, Any]):
+        """Write raw JSON contents and remember them as the cached copy"""
+        try:
+            version = _atomic_write(self._fspath, self._dumps(data))
+        except Exception:
+            self._data = None
+            raise
+        
+        self._data = data
+        self._version = version
+        self._write_cache(data, self._version)
     
     def load(self) -> MemorySnapshot:
-        """Load all mistakes from storage"""
+        """
+        Load all mistakes from storage
+        
+        The file is only re-parsed when it changes; each call still returns
+        a new snapshot, so callers may modify it without affecting the store.
+        """
         try:
-            data = json.loads(self.filepath.read_text())
+            data = self._read_data()
             
-            # Convert dict mistakes to Mistake objects
-            mistakes = [Mistake(**m) for m in data.get("mistakes", [])]
+            # Convert dict mistakes to Mistake objects; the file is written by
+            # save(), so skip re-validating every record and the snapshot
+            mistakes = [Mistake.model_construct(**m) for m in data.get("mistakes", [])]
             
-            return MemorySnapshot(
+            return MemorySnapshot.model_construct(
                 mistakes=mistakes,
                 version=data.get("version", "1.0"),
                 total_runs=data.get("total_runs", 0),
@@ -57,7 +199,7 @@ class MistakeStore:
                 "successful_runs": snapshot.successful_runs
             }
             
-            self.filepath.write_text(json.dumps(data, indent=2))
+            self._write_data(data)
         
         except Exception as e:
             print(f"⚠️  Error saving mistakes: {e}")
@@ -65,38 +207,57 @@ class MistakeStore:
     def add_mistakes(self, new_mistakes: List[Mistake]):
         """
         Add new mistakes to the store, merging with existing ones
+        
+        Works on the raw stored records, so unchanged mistakes are never
+        re-dumped
         """
-        snapshot = self.load()
+        try:
+            data = self._read_data()
+        except Exception as e:
+            print(f"⚠️  Error loading mistakes: {e}")
+            data = {"mistakes": [], "version": "1.0", "total_runs": 0, "successful_runs": 0}
+        
+        records = data.setdefault("mistakes", [])
+        
+        # Index stored records once by (type, rule) so each merge is O(1)
+        index = {}
+        for record in records:
+            index.setdefault((record.get("mistake_type"), record.get("corrective_rule")), record)
         
         for new_mistake in new_mistakes:
             # Check if similar mistake already exists
-            existing = None
-            for stored_mistake in snapshot.mistakes:
-                if (stored_mistake.mistake_type == new_mistake.mistake_type and
-                    stored_mistake.corrective_rule == new_mistake.corrective_rule):
-                    existing = stored_mistake
-                    break
+            key = (new_mistake.mistake_type, new_mistake.corrective_rule)
+            existing = index.get(key)
             
-            if existing:
+            if existing is not None:
                 # Update existing mistake with new occurrence
-                existing.frequency += 1
-                existing.timestamp = new_mistake.timestamp
-                existing.question = new_mistake.question  # ← FIX: Update to latest question
-                existing.description = new_mistake.description  # ← FIX: Update description
+                existing["frequency"] = existing.get("frequency", 1) + 1
+                existing["timestamp"] = new_mistake.timestamp
+                existing["question"] = new_mistake.question  # ← FIX: Update to latest question
+                existing["description"] = new_mistake.description  # ← FIX: Update description
             else:
                 # Add new mistake
-                snapshot.mistakes.append(new_mistake)
+                record = new_mistake.model_dump()
+                records.append(record)
+                index[key] = record
         
         # Keep only recent mistakes
-        if len(snapshot.mistakes) > config.MAX_MISTAKES_STORED:
-            # Sort by frequency and recency
-            snapshot.mistakes.sort(
-                key=lambda m: (m.frequency, m.timestamp),
-                reverse=True
+        if len(records) > config.MAX_MISTAKES_STORED:
+            # Select the top mistakes by frequency and recency without a full sort
+            records[:] = heapq.nlargest(
+                config.MAX_MISTAKES_STORED,
+                records,
+                key=lambda r: (r.get("frequency", 1), r.get("timestamp", ""))
             )
-            snapshot.mistakes = snapshot.mistakes[:config.MAX_MISTAKES_STORED]
         
-        self.save(snapshot)
+        try:
+            self._write_data(data)
+        except Exception as e:
+            print(f"⚠️  Error saving mistakes: {e}")
+    
+    def append_mistake(self, mistake: Mistake):
+        """Record a single mistake, merging it like add_mistakes"""
+        self.add_mistakes([mistake])
     
     def get_recurring_mistakes(self) -> List[Mistake]:
         """Get mistakes that occur frequently"""
@@ -107,30 +268,50 @@ class MistakeStore:
         ]
     
     def update_stats(self, success: bool):
-        """Update run statistics"""
-        snapshot = self.load()
-        snapshot.total_runs += 1
+        """Update run statistics (touches only the counters, not the mistakes)"""
+        try:
+            data = self._read_data()
+        except Exception as e:
+            print(f"⚠️  Error loading mistakes: {e}")
+            data = {"mistakes": [], "version": "1.0", "total_runs": 0, "successful_runs": 0}
+        
+        data["total_runs"] = data.get("total_runs", 0) + 1
         if success:
-            snapshot.successful_runs += 1
-        self.save(snapshot)
+            data["successful_runs"] = data.get("successful_runs", 0) + 1
+        
+        try:
+            self._write_data(data)
+        except Exception as e:
+            print(f"⚠️  Error saving mistakes: {e}")
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get learning statistics"""
-        snapshot = self.load()
+        """Get learning statistics (read from the raw data, no model validation)"""
+        try:
+            data = self._read_data()
+        except Exception as e:
+            print(f"⚠️  Error loading mistakes: {e}")
+            data = {}
         
-        total = snapshot.total_runs
-        successful = snapshot.successful_runs
+        total = data.get("total_runs", 0)
+        successful = data.get("successful_runs", 0)
+        mistakes = data.get("mistakes", [])
         
         return {
             "total_runs": total,
             "successful_runs": successful,
             "failed_runs": total - successful,
             "success_rate": (successful / total * 100) if total > 0 else 0,
-            "total_mistakes": len(snapshot.mistakes),
-            "recurring_patterns": len([m for m in snapshot.mistakes if m.frequency >= 2])
+            "total_mistakes": len(mistakes),
+            "recurring_patterns": sum(1 for m in mistakes if m.get("frequency", 1) >= 2)
         }
     
     def clear(self):
         """Clear all mistakes (for testing)"""
         snapshot = MemorySnapshot(mistakes=[], version="1.0")
         self.save(snapshot)
+
+
+@functools.lru_cache(maxsize=1)
+def get_store() -> MistakeStore:
+    """Process-wide MistakeStore for the default mistakes file, so its cache is shared"""
+    return MistakeStore()
@@ -62,6 +62,8 @@ class Mistake(BaseModel):
     description: str
     corrective_rule: str
     frequency: int = 1
+    # ISO-8601 wall-clock time: persisted to disk and compared as a string,
+    # which orders chronologically (most significant field first)
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
     question: str
 
@@ -0,0 +1,7 @@
+"""
+Shared test setup - makes the project's top-level modules importable
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
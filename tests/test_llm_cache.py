@@ -0,0 +1,89 @@
+"""
+Tests for the LLM completion cache
+"""
+import json
+import sqlite3
+import types
+
+import pytest
+
+import config
+import llm_cache
+from llm_cache import SQLiteLLMCache, cached_chat, clear_llm_cache, invalidate_chat
+
+
+class FakeClient:
+    """Stands in for a Groq client, replying with queued contents"""
+
+    def __init__(self, *contents):
+        self.contents = list(contents)
+        self.calls = 0
+        self.chat = types.SimpleNamespace(
+            completions=types.SimpleNamespace(create=self._create)
+        )
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        message = types.SimpleNamespace(content=self.contents.pop(0))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True)
+    cache = SQLiteLLMCache(tmp_path / "llm_cache.db")
+    monkeypatch.setattr(llm_cache, "_default_cache", cache)
+    return cache
+
+
+def test_identical_requests_hit_the_cache(cache):
+    client = FakeClient("hello")
+
+    assert cached_chat(client, model="m", messages=[]) == "hello"
+    assert cached_chat(client, model="m", messages=[]) == "hello"
+    assert client.calls == 1
+
+
+def test_reply_rejected_by_parse_is_not_cached(cache):
+    client = FakeClient("not json", '{"ok": true}')
+
+    with pytest.raises(ValueError):
+        cached_chat(client, parse=json.loads, model="m", messages=[])
+
+    assert cached_chat(client, parse=json.loads, model="m", messages=[]) == {"ok": True}
+    assert cached_chat(client, parse=json.loads, model="m", messages=[]) == {"ok": True}
+    assert client.calls == 2
+
+
+def test_cache_errors_are_treated_as_a_miss(cache, monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "get", locked)
+    monkeypatch.setattr(cache, "set", locked)
+    client = FakeClient("first", "second")
+
+    assert cached_chat(client, model="m", messages=[]) == "first"
+    assert cached_chat(client, model="m", messages=[]) == "second"
+
+
+def test_invalidated_reply_is_sampled_again(cache):
+    client = FakeClient("rejected plan", "new plan")
+
+    assert cached_chat(client, model="m", messages=[], temperature=0.7) == "rejected plan"
+    invalidate_chat(model="m", messages=[], temperature=0.7)
+
+    assert cached_chat(client, model="m", messages=[], temperature=0.7) == "new plan"
+    assert cached_chat(client, model="m", messages=[], temperature=0.7) == "new plan"
+    assert client.calls == 2
+
+
+def test_clear_drops_every_reply(cache):
+    client = FakeClient("a", "b", "c", "d")
+    cached_chat(client, model="m", messages=[])
+    cached_chat(client, model="n", messages=[])
+
+    clear_llm_cache()
+
+    assert cached_chat(client, model="m", messages=[]) == "c"
+    assert cached_chat(client, model="n", messages=[]) == "d"
@@ -0,0 +1,168 @@
+"""
+Tests for MistakeStore caching and persistence
+"""
+import json
+import os
+import pickle
+import threading
+
+import pytest
+
+import config
+from memory import mistake_store
+from memory.mistake_store import MistakeStore
+from schemas import Mistake
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "mistakes.json"
+
+
+def make_mistake(mistake_type, question="q", timestamp="2026-01-01T00:00:00"):
+    return Mistake(
+        mistake_type=mistake_type,
+        description=f"{mistake_type} for {question}",
+        corrective_rule=f"avoid {mistake_type}",
+        question=question,
+        timestamp=timestamp
+    )
+
+
+def summary(snapshot):
+    return sorted((m.mistake_type, m.frequency, m.question) for m in snapshot.mistakes)
+
+
+def test_change_by_another_store_is_seen(path):
+    reader = MistakeStore(path)
+    writer = MistakeStore(path)
+    assert reader.get_stats()["total_runs"] == 0
+
+    writer.update_stats(success=True)
+    writer.update_stats(success=False)
+
+    assert reader.get_stats()["total_runs"] == 2
+    assert reader.load().total_runs == 2
+
+
+def test_cold_read_uses_current_sidecar(path, monkeypatch):
+    MistakeStore(path).update_stats(success=True)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("JSON file parsed despite a current sidecar")
+
+    monkeypatch.setattr(mistake_store.orjson, "loads", fail)
+    assert MistakeStore(path).get_stats()["total_runs"] == 1
+
+
+def test_stale_sidecar_is_ignored(path):
+    store = MistakeStore(path)
+    store.update_stats(success=True)
+
+    # Same mtime as the JSON file, but recorded for a different file version
+    stat = os.stat(path)
+    stale = ((stat.st_mtime_ns, stat.st_size, stat.st_ino + 1), {"total_runs": 99})
+    store.cache_path.write_bytes(pickle.dumps(stale))
+
+    assert MistakeStore(path).get_stats()["total_runs"] == 1
+
+
+def test_reads_do_not_write_the_sidecar(path):
+    MistakeStore(path).update_stats(success=True)
+    cache_path = MistakeStore(path).cache_path
+    cache_path.unlink()
+
+    MistakeStore(path).get_stats()
+    MistakeStore(path).load()
+
+    assert not cache_path.exists()
+
+
+def test_merge_updates_the_matching_record(path):
+    store = MistakeStore(path)
+    store.add_mistakes([make_mistake("A"), make_mistake("B")])
+
+    # Reordering what load() returned must not redirect the next merge
+    snapshot = store.load()
+    snapshot.mistakes.reverse()
+    store.add_mistakes([make_mistake("A", question="q2")])
+
+    expected = [("A", 2, "q2"), ("B", 1, "q")]
+    assert summary(store.load()) == expected
+    assert summary(MistakeStore(path).load()) == expected
+
+
+def test_patched_file_matches_a_full_save(path, tmp_path):
+    store = MistakeStore(path)
+    store.add_mistakes([make_mistake("A"), make_mistake("B")])
+    store.append_mistake(make_mistake("A", question="q2", timestamp="2026-01-02T00:00:00"))
+    store.append_mistake(make_mistake("C"))
+
+    resaved = MistakeStore(tmp_path / "resaved.json")
+    resaved.save(MistakeStore(path).load())
+
+    assert path.read_bytes() == resaved.filepath.read_bytes()
+
+
+def test_truncation_keeps_most_frequent_then_most_recent(path, monkeypatch):
+    monkeypatch.setattr(config, "MAX_MISTAKES_STORED", 2)
+    store = MistakeStore(path)
+    store.add_mistakes([make_mistake("A"), make_mistake("A", timestamp="2026-01-05T00:00:00")])
+    store.add_mistakes([
+        make_mistake("B", timestamp="2026-01-02T00:00:00"),
+        make_mistake("C", timestamp="2026-01-03T00:00:00"),
+    ])
+
+    kept = [(m.mistake_type, m.frequency) for m in MistakeStore(path).load().mistakes]
+    assert kept == [("A", 2), ("C", 1)]
+
+
+def test_load_returns_an_independent_snapshot(path):
+    store = MistakeStore(path)
+    store.add_mistakes([make_mistake("A")])
+
+    snapshot = store.load()
+    snapshot.mistakes[0].frequency = 50
+    snapshot.mistakes.clear()
+    snapshot.total_runs = 7
+
+    assert summary(store.load()) == [("A", 1, "q")]
+    assert store.get_stats()["total_runs"] == 0
+
+
+def test_concurrent_writers_never_tear_the_file(path, capsys):
+    def write_stats():
+        store = MistakeStore(path)
+        for _ in range(25):
+            store.update_stats(success=True)
+
+    threads = [threading.Thread(target=write_stats) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert "Error" not in capsys.readouterr().out
+    assert json.loads(path.read_text())["total_runs"] > 0
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_write_records_its_own_version_not_a_racing_writers(path, monkeypatch):
+    store = MistakeStore(path)
+    other = MistakeStore(path)
+    store.update_stats(success=True)
+    real_replace = os.replace
+
+    def replace_then_race(src, dst):
+        real_replace(src, dst)
+        if dst == os.fspath(path):
+            # Another writer replaces the file right after our rename
+            monkeypatch.setattr(os, "replace", real_replace)
+            other.update_stats(success=True)
+
+    monkeypatch.setattr(os, "replace", replace_then_race)
+    store.update_stats(success=True)
+
+    assert json.loads(path.read_text())["total_runs"] == 3
+    assert MistakeStore(path).get_stats()["total_runs"] == 3
+    assert store.get_stats()["total_runs"] == 3
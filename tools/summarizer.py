@@ -1,10 +1,16 @@
 """
 Summarization Tool using Groq LLM
 """
-from groq import Groq
 from schemas import SummaryOutput
+from groq_client import get_groq_client
+from llm_cache import cached_chat
 import config
-import json
+import orjson
+
+
+def _parse_summary(content: str) -> SummaryOutput:
+    """Parse and validate a JSON-mode summarization reply"""
+    return SummaryOutput(**orjson.loads(content))
 
 
 def summarize_text(text: str, context: str = "search results") -> SummaryOutput:
@@ -21,8 +27,6 @@ def summarize_text(text: str, context: str = "search results") -> SummaryOutput:
     if not config.GROQ_API_KEY:
         raise ValueError("GROQ_API_KEY not set in environment variables")
     
-    client = Groq(api_key=config.GROQ_API_KEY)
-    
     prompt = f"""Analyze and summarize the following {context}:
 
 {text}
@@ -40,7 +44,10 @@ Return ONLY a JSON object with this structure:
 }}"""
     
     try:
-        response = client.chat.completions.create(
+        # Identical text is summarized once; only a valid summary is cached
+        return cached_chat(
+            get_groq_client(),
+            parse=_parse_summary,
             model=config.GROQ_STRUCTURED_MODEL,
             messages=[
                 {
@@ -53,19 +60,9 @@ Return ONLY a JSON object with this structure:
                 }
             ],
             temperature=0.3,
-            max_tokens=1024
+            max_tokens=1024,
+            response_format={"type": "json_object"}  # JSON mode: bare JSON, no markdown fences
         )
-        
-        content = response.choices[0].message.content.strip()
-        
-        # Extract JSON from potential markdown code blocks
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-        
-        summary_data = json.loads(content)
-        return SummaryOutput(**summary_data)
     
     except Exception as e:
         print(f"⚠️  Summarization error: {e}")